@@ -1,7 +1,6 @@
 """
 Tic Tac Toe Player
 """
-import copy
 import math
 import sys
 
@@ -51,7 +50,7 @@ def result(board, action):
     if board[action[0]][action[1]] != EMPTY or action[0] > 2 or action[1] > 2 or action[0] < 0 or action[1] < 0:
         raise
     currentPlayer = player(board)
-    newBoard = copy.deepcopy(board)
+    newBoard = [row[:] for row in board]
     newBoard[action[0]][action[1]] = currentPlayer
     return newBoard
 
@@ -60,17 +59,8 @@ def winner(board):
     """
     Returns the winner of the game, if there is one.
     """
-    for i in range(3):
-        if board[i][0] != EMPTY and board[i][0] == board[i][1] and board[i][0] == board[i][2]:
-            return board[i][0]
-    for j in range(3):
-        if board[0][j] != EMPTY and board[0][j] == board[1][j] and board[0][j] == board[2][j]:
-            return board[0][j]
-    if board[0][0] != EMPTY and board[0][0] == board[1][1] and board[0][0] == board[2][2]:
-        return board[0][0]
-    if board[0][2] != EMPTY and board[0][2] == board[1][1] and board[0][2] == board[2][0]:
-        return board[0][2]
-    return None
+    xMask, oMask = boardToBits(board)
+    return bitsWinner(xMask, oMask)
 
 
 def terminal(board):
@@ -100,35 +90,144 @@ def minimax(board):
     if terminal(board):
         return None
     currentPlayer = player(board)
-    _, minimaxReturn = maxValue(board) if currentPlayer == X else minValue(board)
-    return minimaxReturn
+    xMask, oMask = boardToBits(board)
+    _, minimaxReturn = maxValue(xMask, oMask) if currentPlayer == X else minValue(xMask, oMask)
+    cell = minimaxReturn.bit_length() - 1
+    return cell // 3, cell % 3
+
+
+# Bitboard search: X's and O's cells are each a 9-bit mask, with cell (i, j)
+# at bit 3 * i + j, so a move is setting one bit and no board is copied
+FULL_BOARD = 0b111111111
+WINS = [
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100,
+]
+
+# HAS_LINE[mask] tells whether the cells in `mask` complete any line in WINS,
+# so finding the winner is one lookup per player
+HAS_LINE = [
+    any(mask & line == line for line in WINS)
+    for mask in range(FULL_BOARD + 1)
+]
+
+# Center first, then corners, then edges: strong moves early give
+# alpha-beta more cutoffs
+MOVE_ORDER = [
+    1 << 4,
+    1 << 0, 1 << 2, 1 << 6, 1 << 8,
+    1 << 1, 1 << 3, 1 << 5, 1 << 7,
+]
+
+
+def boardToBits(board):
+    """
+    Returns the (X mask, O mask) bitboard pair for a list-of-lists board.
+    """
+    xMask = 0
+    oMask = 0
+    for rowIndex in range(3):
+        for columnIndex in range(3):
+            bit = 1 << (3 * rowIndex + columnIndex)
+            if board[rowIndex][columnIndex] == X:
+                xMask = xMask | bit
+            elif board[rowIndex][columnIndex] == O:
+                oMask = oMask | bit
+    return xMask, oMask
 
-def maxValue(board, boundary=sys.maxsize):
-    if terminal(board):
-        return utility(board), None
+
+def bitsWinner(xMask, oMask):
+    """
+    Returns the winner of a bitboard position, if there is one.
+    """
+    if HAS_LINE[xMask]:
+        return X
+    if HAS_LINE[oMask]:
+        return O
+    return None
+
+
+def bitsActions(xMask, oMask):
+    """
+    Yields the bit of each empty cell in MOVE_ORDER.
+    """
+    occupied = xMask | oMask
+    for bit in MOVE_ORDER:
+        if not occupied & bit:
+            yield bit
+
+
+def bitsTerminalValue(xMask, oMask):
+    """
+    Returns the utility of a finished bitboard position, or None if the
+    game is not over yet.
+    """
+    currentWinner = bitsWinner(xMask, oMask)
+    if currentWinner is not None:
+        return 1 if currentWinner == X else -1
+    if xMask | oMask == FULL_BOARD:
+        return 0
+    return None
+
+
+# Transposition table: position -> (lower bound, upper bound, action), where
+# the action reaches the lower bound for X or the upper bound for O. Bounds
+# rather than values are stored because alpha-beta cutoffs only bound the
+# value of a position
+TRANSPOSITIONS = {}
+
+
+def maxValue(xMask, oMask, alpha=-sys.maxsize - 1, beta=sys.maxsize):
+    terminalValue = bitsTerminalValue(xMask, oMask)
+    if terminalValue is not None:
+        return terminalValue, None
+    position = (xMask, oMask)
+    lower, upper, cachedAction = TRANSPOSITIONS.get(position, (-sys.maxsize - 1, sys.maxsize, None))
+    if lower == upper or lower >= beta:
+        return lower, cachedAction
+    if upper <= alpha:
+        return upper, cachedAction
     resultValue = -sys.maxsize - 1
     resultAction = None
-    for action in actions(board):
-        actionValue, _ = minValue(result(board, action), boundary)
+    for action in bitsActions(xMask, oMask):
+        actionValue, _ = minValue(xMask | action, oMask, max(alpha, resultValue), beta)
         if actionValue > resultValue:
             resultValue = actionValue
-            boundary = resultValue
             resultAction = action
-        if actionValue > boundary:
+        if resultValue >= beta:
             break
+    if resultValue <= alpha:
+        TRANSPOSITIONS[position] = (lower, resultValue, cachedAction)
+    elif resultValue >= beta:
+        TRANSPOSITIONS[position] = (resultValue, upper, resultAction)
+    else:
+        TRANSPOSITIONS[position] = (resultValue, resultValue, resultAction)
     return resultValue, resultAction
 
-def minValue(board, boundary=-sys.maxsize - 1):
-    if terminal(board):
-        return utility(board), None
+def minValue(xMask, oMask, alpha=-sys.maxsize - 1, beta=sys.maxsize):
+    terminalValue = bitsTerminalValue(xMask, oMask)
+    if terminalValue is not None:
+        return terminalValue, None
+    position = (xMask, oMask)
+    lower, upper, cachedAction = TRANSPOSITIONS.get(position, (-sys.maxsize - 1, sys.maxsize, None))
+    if lower == upper or upper <= alpha:
+        return upper, cachedAction
+    if lower >= beta:
+        return lower, cachedAction
     resultValue = sys.maxsize
     resultAction = None
-    for action in actions(board):
-        actionValue, _ = maxValue(result(board, action), boundary)
+    for action in bitsActions(xMask, oMask):
+        actionValue, _ = maxValue(xMask, oMask | action, alpha, min(beta, resultValue))
         if actionValue < resultValue:
             resultValue = actionValue
-            boundary = resultValue
             resultAction = action
-        if actionValue < boundary:
+        if resultValue <= alpha:
             break
+    if resultValue <= alpha:
+        TRANSPOSITIONS[position] = (lower, resultValue, resultAction)
+    elif resultValue >= beta:
+        TRANSPOSITIONS[position] = (resultValue, upper, cachedAction)
+    else:
+        TRANSPOSITIONS[position] = (resultValue, resultValue, resultAction)
     return resultValue, resultAction
\ No newline at end of file
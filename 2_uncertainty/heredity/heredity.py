@@ -1,7 +1,8 @@
 import csv
-import itertools
 import sys
 
+import numpy as np
+
 PROBS = {
 
     # Unconditional probabilities for having gene
@@ -36,6 +37,9 @@ PROBS = {
     "mutation": 0.01
 }
 
+# Number of (gene, trait) assignments evaluated per vectorized batch
+BATCH_SIZE = 65536
+
 
 def main():
 
@@ -60,26 +64,45 @@ def main():
         for person in people
     }
 
-    # Loop over all sets of people who might have the trait
-    names = set(people)
-    for have_trait in powerset(names):
-
-        # Check if current set of people violates known information
-        fails_evidence = any(
-            (people[person]["trait"] is not None and
-             people[person]["trait"] != (person in have_trait))
-            for person in names
+    # Index people by position so parents can be looked up by integer id
+    names = list(people)
+    father_idx, mother_idx = parent_indices(people, names)
+    trait_value = np.array([
+        people[name]["trait"] is True for name in names
+    ], dtype=np.int8)
+    unknown = np.array([
+        i for i, name in enumerate(names) if people[name]["trait"] is None
+    ], dtype=np.intp)
+
+    # Each assignment is an integer code decoded one digit per person:
+    # base 3 for gene counts, and bits of a mask over the unknown people
+    # for traits (people with a known trait keep it in every row)
+    n = len(names)
+    gene_place = 3 ** np.arange(n)
+    trait_masks = np.arange(1 << len(unknown))[:, None]
+    traits = np.tile(trait_value, (len(trait_masks), 1))
+    traits[:, unknown] = (trait_masks >> np.arange(len(unknown))) & 1
+
+    # Evaluate every (gene, trait) pair in batches and accumulate totals
+    gene_totals = np.zeros((n, 3))
+    trait_totals = np.zeros((n, 2))
+    total = 3 ** n * len(traits)
+    for start in range(0, total, BATCH_SIZE):
+        pairs = np.arange(start, min(start + BATCH_SIZE, total))
+        gene_codes = pairs[:, None] // len(traits)
+        batch_genes = (gene_codes // gene_place % 3).astype(np.int8)
+        batch_traits = traits[pairs % len(traits)]
+        accumulate_batch(
+            gene_totals, trait_totals, batch_genes, batch_traits,
+            father_idx, mother_idx
         )
-        if fails_evidence:
-            continue
 
-        # Loop over all sets of people who might have the gene
-        for one_gene in powerset(names):
-            for two_genes in powerset(names - one_gene):
-
-                # Update probabilities with new joint probability
-                p = joint_probability(people, one_gene, two_genes, have_trait)
-                update(probabilities, one_gene, two_genes, have_trait, p)
+    # Copy accumulated totals back into the per-person distributions
+    for i, name in enumerate(names):
+        for gene in probabilities[name]['gene']:
+            probabilities[name]['gene'][gene] = gene_totals[i, gene]
+        for trait in probabilities[name]['trait']:
+            probabilities[name]['trait'][trait] = trait_totals[i, int(trait)]
 
     # Ensure probabilities sum to 1
     normalize(probabilities)
@@ -116,16 +139,26 @@ def load_data(filename):
     return data
 
 
-def powerset(s):
+def parent_indices(people, names):
     """
-    Return a list of all possible subsets of set s.
+    Return two int32 arrays mapping the position of each person in `names`
+    to the position of their father and mother, or -1 if they have no parents.
     """
-    s = list(s)
-    return [
-        set(s) for s in itertools.chain.from_iterable(
-            itertools.combinations(s, r) for r in range(len(s) + 1)
-        )
-    ]
+    person_index = {name: i for i, name in enumerate(names)}
+    father_idx = np.array([
+        person_index.get(people[name]["father"], -1) for name in names
+    ], dtype=np.int32)
+    mother_idx = np.array([
+        person_index.get(people[name]["mother"], -1) for name in names
+    ], dtype=np.int32)
+    return father_idx, mother_idx
+
+
+def gene_count(name, one_gene, two_genes):
+    """
+    Return how many copies of the gene `name` has in the given sets.
+    """
+    return 1 if name in one_gene else 2 if name in two_genes else 0
 
 
 INHERIT_PROBABILITY = {
@@ -203,6 +236,21 @@ INHERIT_PROBABILITY = {
     }
 }
 
+# Array forms of the tables above, indexed by gene count and trait (0 or 1)
+GENE_PRIOR = np.array([PROBS['gene'][gene] for gene in range(3)])
+TRAIT_TABLE = np.array([
+    [PROBS['trait'][gene][trait] for trait in (False, True)]
+    for gene in range(3)
+])
+INHERIT_TABLE = np.array([
+    [
+        [INHERIT_PROBABILITY[gene][father][mother] for mother in range(3)]
+        for father in range(3)
+    ]
+    for gene in range(3)
+])
+INHERIT_FLAT = INHERIT_TABLE.ravel()
+
 
 def joint_probability(people, one_gene, two_genes, have_trait):
     """
@@ -215,37 +263,47 @@ def joint_probability(people, one_gene, two_genes, have_trait):
         * everyone in set `have_trait` has the trait, and
         * everyone not in set` have_trait` does not have the trait.
     """
-    probabilities = []
-    for name in people:
-        person_genes = None
-        person_trait = None
-        if name in one_gene:   
-            person_genes = 1
-        elif name in two_genes:
-            person_genes = 2
-        else:
-            person_genes = 0
-        if name in have_trait:
-            person_trait = True
-        else:
-            person_trait = False
-        gene_probability = 0
-        trait_probability = 0
-        father = people[name]['father']
-        mother = people[name]['mother']
-        if father == None and mother == None:
-            gene_probability = PROBS['gene'][person_genes]
-            trait_probability = PROBS['trait'][person_genes][person_trait]
-        else:
-            father_genes = 1 if father in one_gene else 2 if father in two_genes else 0
-            mother_genes = 1 if mother in one_gene else 2 if mother in two_genes else 0
-            gene_probability = INHERIT_PROBABILITY[person_genes][father_genes][mother_genes]
-            trait_probability = PROBS['trait'][person_genes][person_trait]
-        probabilities.append(gene_probability*trait_probability)
-    result = 1
-    for value in probabilities:
-        result = result*value
-    return result
+    names = list(people)
+    father_idx, mother_idx = parent_indices(people, names)
+    genes = np.array([[gene_count(name, one_gene, two_genes) for name in names]])
+    traits = np.array([[name in have_trait for name in names]], dtype=np.int8)
+    return batch_probability(genes, traits, father_idx, mother_idx)[0]
+
+
+def batch_probability(genes, traits, father_idx, mother_idx):
+    """
+    Compute the joint probability of each row of a batch of assignments.
+    In row b, the person at position i has `genes[b, i]` copies of the gene
+    and trait `traits[b, i]` (0 or 1). `father_idx[i]` and `mother_idx[i]`
+    are the positions of that person's parents, or -1 if not listed.
+    """
+    genes = genes.astype(np.intp)
+    founders = (father_idx < 0) & (mother_idx < 0)
+
+    # A missing parent of someone who is not a founder counts as having
+    # no copies of the gene
+    father_genes = np.where(father_idx < 0, 0, genes[:, np.maximum(father_idx, 0)])
+    mother_genes = np.where(mother_idx < 0, 0, genes[:, np.maximum(mother_idx, 0)])
+    gene_probability = np.where(
+        founders,
+        GENE_PRIOR[genes],
+        INHERIT_FLAT[9*genes + 3*father_genes + mother_genes]
+    )
+    trait_probability = TRAIT_TABLE[genes, traits]
+    return np.prod(gene_probability*trait_probability, axis=1)
+
+
+def accumulate_batch(gene_totals, trait_totals, genes, traits, father_idx, mother_idx):
+    """
+    Compute the joint probability of each row of a batch of assignments
+    (as in `batch_probability`) and add it straight into `gene_totals[i, g]`
+    and `trait_totals[i, t]` for the gene count and trait of each person i.
+    """
+    p = batch_probability(genes, traits, father_idx, mother_idx)
+    for gene in range(3):
+        gene_totals[:, gene] += p @ (genes == gene)
+    for trait in range(2):
+        trait_totals[:, trait] += p @ (traits == trait)
 
 
 def update(probabilities, one_gene, two_genes, have_trait, p):
@@ -256,18 +314,8 @@ def update(probabilities, one_gene, two_genes, have_trait, p):
     the person is in `have_gene` and `have_trait`, respectively.
     """
     for name in probabilities:
-        person_genes = None
-        person_trait = None
-        if name in one_gene:   
-            person_genes = 1
-        elif name in two_genes:
-            person_genes = 2
-        else:
-            person_genes = 0
-        if name in have_trait:
-            person_trait = True
-        else:
-            person_trait = False
+        person_genes = gene_count(name, one_gene, two_genes)
+        person_trait = name in have_trait
         probabilities[name]['gene'][person_genes] = probabilities[name]['gene'][person_genes] + p
         probabilities[name]['trait'][person_trait] = probabilities[name]['trait'][person_trait] + p
 
@@ -3,6 +3,9 @@ import random
 import re
 import sys
 
+import numpy as np
+from scipy.sparse import csr_matrix
+
 DAMPING = 0.85
 SAMPLES = 10000
 CALC_THRESHOLD = 0.001
@@ -58,18 +61,34 @@ def transition_model(corpus, page, damping_factor):
     linked to by `page`. With probability `1 - damping_factor`, choose
     a link at random chosen from all pages in the corpus.
     """
-    corpus_copy = corpus.copy()
-    result = {}
-    if len(corpus[page]) == 0:
-        corpus_copy[page] = set(
-            p for p in corpus
-        )
-    number_of_pages = len(corpus_copy)
-    pages_linked_to = corpus_copy[page]
-    for p in corpus_copy:
-        num_links = (1 if p in pages_linked_to else 0) / len(pages_linked_to)
-        result[p] = (1-damping_factor)*(1/number_of_pages) + damping_factor*num_links
-    return result
+    pages_linked_to = corpus[page] or corpus.keys()
+    base_probability = (1-damping_factor)*(1/len(corpus))
+    link_probability = base_probability + damping_factor*(1/len(pages_linked_to))
+    return {
+        p: link_probability if p in pages_linked_to else base_probability
+        for p in corpus
+    }
+
+
+def link_matrix(corpus, page_index):
+    """
+    Return a sparse matrix `M` where `M[i, j]` is the probability that a
+    surfer on page j follows a link to page i, i.e. 1 / (number of links
+    on page j) for every link j -> i. A page with no links is treated as
+    linking to every page in the corpus, itself included.
+    """
+    n = len(page_index)
+    rows = []
+    columns = []
+    data = []
+    for page, links in corpus.items():
+        j = page_index[page]
+        targets = links if len(links) > 0 else corpus
+        for link in targets:
+            rows.append(page_index[link])
+            columns.append(j)
+            data.append(1 / len(targets))
+    return csr_matrix((data, (rows, columns)), shape=(n, n))
 
 
 def sample_pagerank(corpus, damping_factor, n):
@@ -81,32 +100,23 @@ def sample_pagerank(corpus, damping_factor, n):
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
     """
-    result = {}
-    for p in corpus:
-        result[p] = 0
     page_names = list(corpus)
-    random_page = page_names[int(random.random() * len(page_names))]
-    current_page = random_page
-    dp_model_dict = {}
+    number_of_pages = len(page_names)
+    page_index = {p: i for i, p in enumerate(page_names)}
+
+    # Row i of `transitions` is the transition model of page i, stored
+    # as cumulative probabilities so the next page is a binary search
+    links = link_matrix(corpus, page_index).toarray().T
+    transitions = (1 - damping_factor) / number_of_pages + damping_factor * links
+    cdf = np.cumsum(transitions, axis=1)
+
+    counts = np.zeros(number_of_pages, dtype=np.int64)
+    current_index = int(random.random() * number_of_pages)
     for i in range(n):
-        dp_key = f'{current_page}-{damping_factor}'
-        model = {}
-        if dp_key in dp_model_dict:
-            model = dp_model_dict[dp_key]  
-        else:
-            model = transition_model(corpus, current_page, damping_factor)
-            dp_model_dict[dp_key] = model
-        random_value = random.random()
-        model_threshold = 0
-        for p in model:
-            model_threshold = model_threshold + model[p]
-            if random_value < model_threshold:
-                result[p] = result[p] + 1
-                current_page = p
-                break
-    for p in result:
-        result[p] = result[p]/n
-    return result
+        next_index = np.searchsorted(cdf[current_index], random.random(), side='right')
+        current_index = min(next_index, number_of_pages - 1)
+        counts[current_index] = counts[current_index] + 1
+    return dict(zip(page_names, (counts / n).tolist()))
 
 
 def iterate_pagerank(corpus, damping_factor):
@@ -117,39 +127,26 @@ def iterate_pagerank(corpus, damping_factor):
     Return a dictionary where keys are page names, and values are
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
-    """    
+    """
     max_retries = 10000000
-    result = {}
     n = len(corpus)
-    received_links = {}
-    for p in corpus:
-        result[p] = 1/n
-        if len(corpus[p]) == 0:
-            corpus[p] = set(
-                l for l in corpus
-            )
-        for l in corpus[p]:
-            if l not in received_links:
-                received_links[l] = {}
-            received_links[l][p] = True
-
-    should_repeat = True
-    i = 0
-    while should_repeat:
-        should_repeat = False
-        base_pr = result.copy()
-        for p in result:
-            links = received_links[p]
-            sum_links = 0
-            for l in links:
-                sum_links = sum_links + base_pr[l]/len(corpus[l])
-            result[p] = (1-damping_factor)/n + damping_factor*sum_links
-            if abs(result[p] - base_pr[p]) > CALC_THRESHOLD:
-                should_repeat = True
-        i = i + 1
-        if i > max_retries:
-            raise f'max retry reached'
-    return result
+    page_index = {p: i for i, p in enumerate(corpus)}
+    links = link_matrix(corpus, page_index)
+
+    # Double-buffer the rank vectors: each iteration writes into
+    # `new_ranks` and then swaps it with `ranks`
+    ranks = np.full(n, 1 / n)
+    new_ranks = np.empty(n)
+    change = np.empty(n)
+    for _ in range(max_retries):
+        np.multiply(links @ ranks, damping_factor, out=new_ranks)
+        new_ranks += (1 - damping_factor) / n
+        np.subtract(new_ranks, ranks, out=change)
+        np.abs(change, out=change)
+        ranks, new_ranks = new_ranks, ranks
+        if change.max() <= CALC_THRESHOLD:
+            return dict(zip(page_index, ranks.tolist()))
+    raise RuntimeError('max retry reached')
 
 
 if __name__ == "__main__":
@@ -1,4 +1,5 @@
 import sys
+from collections import Counter
 
 from crossword import *
 
@@ -15,6 +16,16 @@ class CrosswordCreator():
             for var in self.crossword.variables
         }
 
+        # Overlapping variables of each variable, and their number, which
+        # is used to break MRV ties
+        self.neighbors = {
+            var: self.crossword.neighbors(var)
+            for var in self.crossword.variables
+        }
+        self.degrees = {
+            var: len(neighbors) for var, neighbors in self.neighbors.items()
+        }
+
     def letter_grid(self, assignment):
         """
         Return 2D array representing a given assignment.
@@ -105,11 +116,12 @@ class CrosswordCreator():
                 if variable.length != len(value):
                     self.domains[variable].remove(value)
 
-    def revise(self, x, y):
+    def revise(self, x, y, trail=None):
         """
         Make variable `x` arc consistent with variable `y`.
         To do so, remove values from `self.domains[x]` for which there is no
         possible corresponding value for `y` in `self.domains[y]`.
+        If `trail` is given, append each removed `(x, value)` pair to it.
 
         Return True if a revision was made to the domain of `x`; return
         False if no revision was made.
@@ -118,23 +130,28 @@ class CrosswordCreator():
         if overlap == None:
             return False
         result = False
-        x_domain = self.domains[x].copy()
-        for x_value in x_domain:
-            has_valid_y = False
-            for y_value in self.domains[y]:
-                if x_value[overlap[0]] == y_value[overlap[1]]:
-                    has_valid_y = True
-                    break
-            if not has_valid_y:
-                self.domains[x].remove(x_value)
-                result = True
+
+        # A value of `x` is supported if its overlap letter is among the
+        # letters the values of `y` have at the overlap
+        y_letters = {y_value[overlap[1]] for y_value in self.domains[y]}
+        unsupported = [
+            x_value for x_value in self.domains[x]
+            if x_value[overlap[0]] not in y_letters
+        ]
+        for x_value in unsupported:
+            self.domains[x].remove(x_value)
+            if trail is not None:
+                trail.append((x, x_value))
+            result = True
         return result
 
-    def ac3(self, arcs=None):
+    def ac3(self, arcs=None, trail=None):
         """
         Update `self.domains` such that each variable is arc consistent.
         If `arcs` is None, begin with initial list of all arcs in the problem.
         Otherwise, use `arcs` as the initial list of arcs to make consistent.
+        If `trail` is given, record every removed `(variable, value)` pair
+        in it so the removals can be undone.
 
         Return True if arc consistency is enforced and no domains are empty;
         return False if one or more domains end up empty.
@@ -146,10 +163,10 @@ class CrosswordCreator():
                     arcs.insert(0, overlap_tuple)
         while len(arcs) > 0:
             [x, y] = arcs.pop()
-            if self.revise(x, y):
+            if self.revise(x, y, trail):
                 if len(self.domains[x]) == 0:
                     return False
-                for z in self.crossword.neighbors(x):
+                for z in self.neighbors[x]:
                     if y != z:
                         arcs.insert(0, (z, x))
         return True
@@ -167,15 +184,15 @@ class CrosswordCreator():
         Return True if `assignment` is consistent (i.e., words fit in crossword
         puzzle without conflicting characters); return False otherwise.
         """
-        values_present = []
+        values_present = set()
         for variable in assignment:
             value = assignment[variable]
             if len(value) != variable.length:
                 return False
             if value in values_present:
                 return False
-            values_present.append(value)
-            for neighbor in self.crossword.neighbors(variable):
+            values_present.add(value)
+            for neighbor in self.neighbors[variable]:
                 i, j = self.crossword.overlaps[variable, neighbor]
                 if neighbor in assignment and value[i] != assignment[neighbor][j]:
                     return False
@@ -188,20 +205,28 @@ class CrosswordCreator():
         The first value in the list, for example, should be the one
         that rules out the fewest values among the neighbors of `var`.
         """
+        # For each unassigned neighbor, count its values by the letter they
+        # have at the overlap; the values ruled out by `value` are those
+        # without `value[i]` at position j
+        neighbors = []
+        for neighbor in self.neighbors[var]:
+            if neighbor in assignment:
+                continue
+            i, j = self.crossword.overlaps[var, neighbor]
+            letter_counts = Counter(
+                neighbor_value[j] for neighbor_value in self.domains[neighbor]
+            )
+            neighbors.append((i, letter_counts, len(self.domains[neighbor])))
         elimination_rank_per_value_dict = {}
-        result = []
         for value in self.domains[var]:
-            result.append(value)
             elimination_rank_per_value_dict[value] = 0
-            for neighbor in self.crossword.neighbors(var):
-                if neighbor in assignment:
-                    continue
-                i, j = self.crossword.overlaps[var, neighbor]
-                for neighbor_value in self.domains[neighbor]:
-                    if value[i] != neighbor_value[j]:
-                        elimination_rank_per_value_dict[value] = elimination_rank_per_value_dict[value] + 1
-        result.sort(key=lambda x: elimination_rank_per_value_dict[x])
-        return result            
+            for i, letter_counts, domain_size in neighbors:
+                elimination_rank_per_value_dict[value] += (
+                    domain_size - letter_counts[value[i]]
+                )
+        return sorted(
+            self.domains[var], key=elimination_rank_per_value_dict.get
+        )
 
     def select_unassigned_variable(self, assignment):
         """
@@ -211,10 +236,10 @@ class CrosswordCreator():
         degree. If there is a tie, any of the tied variables are acceptable
         return values.
         """
-        unassigned_variables = list(set(self.domains) - set(assignment))
-        unassigned_variables.sort(key=lambda x: len(
-            self.domains[x]) * 10000 + len(self.crossword.neighbors(x)))
-        return unassigned_variables[0]
+        return min(
+            (var for var in self.domains if var not in assignment),
+            key=lambda var: (len(self.domains[var]), -self.degrees[var])
+        )
 
     def backtrack(self, assignment):
         if len(assignment) == len(self.domains):
@@ -224,16 +249,24 @@ class CrosswordCreator():
         for value in values:
             new_assignment = assignment.copy()
             new_assignment[var] = value
-            domains_backup = self.domains.copy()
-            arcs = set(filter(lambda x: x[0] not in new_assignment, self.crossword.overlaps))
-            self.ac3(arcs)
-            result = None
-            if self.consistent(new_assignment):
+            if not self.consistent(new_assignment):
+                continue
+
+            # Narrow `var` to `value` and propagate, recording every removed
+            # value on `trail` so the domains can be restored on failure
+            trail = [(var, other) for other in self.domains[var] if other != value]
+            for variable, removed in trail:
+                self.domains[variable].remove(removed)
+            arcs = [
+                (y, var) for y in self.neighbors[var]
+                if y not in new_assignment
+            ]
+            if self.ac3(arcs, trail):
                 result = self.backtrack(new_assignment)
                 if result != None:
                     return result
-            if result == None:
-                self.domains = domains_backup
+            for variable, removed in trail:
+                self.domains[variable].add(removed)
         return None
 
 